@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# comment: zrbin2sql 基准测试：渲染阶段（合成行事件）与端到端流水线（binlog 样本文件），
+#          输出 events/sec、bytes/sec、峰值 RSS，并与保存的基线比较
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import zrbin2sql  # noqa: E402
+from binlog_writer import FIXTURES_DIR  # noqa: E402
+from synthetic import generate_events  # noqa: E402
+
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+# 吞吐下降或峰值内存上升超过该比例视为回归
+DEFAULT_TOLERANCE = 0.2
+FIXTURE_FILES = [os.path.join(FIXTURES_DIR, name) for name in ("mysql-bin.000001", "mysql-bin.000002")]
+
+
+def peak_rss_bytes():
+    # Linux 上 ru_maxrss 的单位是 KB，macOS 上是字节
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def bench_render(profile, events, render_options):
+    # 只测渲染：事件预先生成在内存中，计时范围只包含 process_binlogevent
+    binlogevents = list(generate_events(profile, events))
+    output_bytes = 0
+    started = time.perf_counter()
+    for binlogevent in binlogevents:
+        for item in zrbin2sql.process_binlogevent(binlogevent, 0, sys.maxsize, **render_options):
+            output_bytes += len(item["sql"]) + len(item["rollback_sql"])
+    elapsed = time.perf_counter() - started
+    return {"events": len(binlogevents), "bytes": output_bytes, "seconds": elapsed}
+
+
+def bench_pipeline(main_options):
+    # 端到端：离线解析 binlog 样本文件并写出 SQL 文件，bytes 为读取的 binlog 字节数
+    events = 0
+    for binlogevent in zrbin2sql.LocalBinLogReader(FIXTURE_FILES):
+        events += 1
+    input_bytes = sum(os.path.getsize(path) for path in FIXTURE_FILES)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="zrbin2sql_bench_") as directory:
+        os.chdir(directory)
+        try:
+            started = time.perf_counter()
+            zrbin2sql.main(local_binlog=FIXTURE_FILES, binlog_pos=4, st="2000-01-01 00:00:00",
+                           et="2100-01-01 00:00:00", max_workers=4, mysql_charset="utf8", **main_options)
+            elapsed = time.perf_counter() - started
+        finally:
+            os.chdir(cwd)
+    return {"events": events, "bytes": input_bytes, "seconds": elapsed}
+
+
+BENCHMARKS = {
+    "render-narrow": lambda: bench_render("narrow", 5000, {}),
+    "render-wide": lambda: bench_render("wide", 500, {}),
+    "render-large-values": lambda: bench_render("large-values", 500, {}),
+    "render-update-heavy": lambda: bench_render("update-heavy", 1000, {"replace_output": True,
+                                                                       "replace_without_null_output": True}),
+    "render-pk-where": lambda: bench_render("narrow", 5000, {"pk_where": True}),
+    "pipeline-local": lambda: bench_pipeline({}),
+    "pipeline-local-processes": lambda: bench_pipeline({"render_processes": 2}),
+    "pipeline-local-batch": lambda: bench_pipeline({"batch_rollback": 1000}),
+}
+
+
+def run_one(name, repeat):
+    # 在独立的子进程中执行，峰值 RSS 只反映这一个基准；重复 repeat 次取最快的一次
+    best = None
+    for _ in range(repeat):
+        result = BENCHMARKS[name]()
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return {"events_per_sec": best["events"] / best["seconds"], "bytes_per_sec": best["bytes"] / best["seconds"],
+            "peak_rss": peak_rss_bytes(), "events": best["events"], "bytes": best["bytes"],
+            "seconds": best["seconds"]}
+
+
+def run_isolated(name, repeat):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", name, "--repeat", str(repeat)],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get("results", {}).get(name)
+        if expected is None:
+            continue
+        if result["events_per_sec"] < expected["events_per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: events/sec {result['events_per_sec']:.0f} < "
+                               f"基线 {expected['events_per_sec']:.0f}")
+        if result["peak_rss"] > expected["peak_rss"] * (1 + tolerance):
+            regressions.append(f"{name}: 峰值RSS {result['peak_rss'] / 1048576:.1f}MB > "
+                               f"基线 {expected['peak_rss'] / 1048576:.1f}MB")
+    return regressions
+
+
+def print_results(results, baseline):
+    expected = baseline.get("results", {}) if baseline else {}
+    print(f"{'benchmark':<28}{'events/sec':>14}{'MB/sec':>10}{'peak RSS MB':>13}{'vs 基线':>10}")
+    for name, result in results.items():
+        change = ""
+        if name in expected:
+            change = f"{result['events_per_sec'] / expected[name]['events_per_sec'] - 1:+.1%}"
+        print(f"{name:<28}{result['events_per_sec']:>14.0f}{result['bytes_per_sec'] / 1048576:>10.2f}"
+              f"{result['peak_rss'] / 1048576:>13.1f}{change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="zrbin2sql 基准测试")
+    parser.add_argument("benchmarks", nargs="*", help=f"要运行的基准，默认全部：{', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=3, help="每个基准重复次数，取最快的一次，默认3")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="基线文件，默认benchmarks/baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为新的基线")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="允许的波动比例，默认0.2（吞吐下降或峰值内存上升超过20%%视为回归）")
+    parser.add_argument("--json", dest="json_output", help="把结果另存为JSON文件")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(args.child, args.repeat)))
+        return 0
+
+    names = args.benchmarks or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"未知的基准: {', '.join(unknown)}")
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    results = {name: run_isolated(name, args.repeat) for name in names}
+    print_results(results, baseline)
+
+    report = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+    if args.json_output:
+        with open(args.json_output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    if args.save_baseline:
+        if baseline:
+            # 只覆盖本次运行的基准，其余保留
+            baseline["results"].update(results)
+            report["results"] = baseline["results"]
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"基线已保存到 {args.baseline}")
+        return 0
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\n性能回归：")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
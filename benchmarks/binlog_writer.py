@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# comment: 生成用于基准测试的 binlog 文件（MySQL 8.0 格式，ROW 模式，binlog_row_metadata=FULL）
+
+import datetime
+import os
+import random
+import struct
+import sys
+import zlib
+
+from pymysqlreplication.constants import FIELD_TYPE
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# 事件类型
+FORMAT_DESCRIPTION_EVENT = 0x0F
+XID_EVENT = 0x10
+QUERY_EVENT = 0x02
+TABLE_MAP_EVENT = 0x13
+WRITE_ROWS_EVENT_V2 = 0x1E
+UPDATE_ROWS_EVENT_V2 = 0x1F
+DELETE_ROWS_EVENT_V2 = 0x20
+
+# TableMapEvent 可选元数据类型
+SIGNEDNESS = 1
+COLUMN_CHARSET = 3
+COLUMN_NAME = 4
+SIMPLE_PRIMARY_KEY = 8
+
+CHARSET_UTF8MB4 = 45
+CHARSET_BINARY = 63
+NUMERIC_TYPES = (FIELD_TYPE.LONG, FIELD_TYPE.LONGLONG)
+CHARACTER_TYPES = (FIELD_TYPE.VARCHAR, FIELD_TYPE.BLOB)
+
+# 固定的起始时间，保证每次生成的文件完全一致（2024-08-26 10:00:00 +08:00）
+FIXTURE_START_TIME = 1724637600
+
+
+def lenenc(n):
+    if n < 251:
+        return bytes([n])
+    if n < 1 << 16:
+        return b'\xfc' + struct.pack('<H', n)
+    if n < 1 << 24:
+        return b'\xfd' + struct.pack('<I', n)[:3]
+    return b'\xfe' + struct.pack('<Q', n)
+
+
+def pack_datetime2(value):
+    # DATETIME2(0)：5 字节大端，最高位为符号位
+    year_month = value.year * 13 + value.month
+    packed = (((year_month << 5) | value.day) << 17) | (value.hour << 12) | (value.minute << 6) | value.second
+    return (packed + 0x8000000000).to_bytes(5, 'big')
+
+
+class BinlogWriter(object):
+    # 按 binlog v4 格式顺序写事件，每个事件带 CRC32 校验和；columns 为 [(列名, FIELD_TYPE, 字符集)]
+
+    def __init__(self, path, server_version='8.0.36-log', server_id=1):
+        self.file = open(path, 'wb')
+        self.file.write(b'\xfebin')
+        self.pos = 4
+        self.server_id = server_id
+        body = (struct.pack('<H', 4) + server_version.encode().ljust(50, b'\0') + struct.pack('<I', 0) +
+                bytes([19]) + bytes(40) + bytes([1]))
+        self.event(FORMAT_DESCRIPTION_EVENT, body, FIXTURE_START_TIME)
+
+    def event(self, event_type, body, timestamp):
+        size = 19 + len(body) + 4
+        data = struct.pack('<IBIIIH', timestamp, event_type, self.server_id, size, self.pos + size, 0) + body
+        self.file.write(data + struct.pack('<I', zlib.crc32(data)))
+        self.pos += size
+
+    def query(self, schema, query, timestamp):
+        status = b''
+        body = (struct.pack('<IIBHH', 1, 0, len(schema), 0, len(status)) + status + schema.encode() + b'\0' +
+                query.encode())
+        self.event(QUERY_EVENT, body, timestamp)
+
+    def table_map(self, table_id, schema, table, columns, timestamp, primary_key=(0,)):
+        types = bytes(column_type for _, column_type, _ in columns)
+        meta = b''
+        for _, column_type, _ in columns:
+            if column_type == FIELD_TYPE.VARCHAR:
+                meta += struct.pack('<H', 1024)
+            elif column_type == FIELD_TYPE.BLOB:
+                meta += bytes([2])
+            elif column_type == FIELD_TYPE.DATETIME2:
+                meta += bytes([0])
+        numeric = sum(1 for _, column_type, _ in columns if column_type in NUMERIC_TYPES)
+        signedness = bytes((numeric + 7) // 8)
+        charsets = b''.join(lenenc(charset) for _, column_type, charset in columns if column_type in CHARACTER_TYPES)
+        names = b''.join(lenenc(len(name)) + name.encode() for name, _, _ in columns)
+        keys = b''.join(lenenc(index) for index in primary_key)
+        optional = b''.join(bytes([field]) + lenenc(len(value)) + value for field, value in (
+            (SIGNEDNESS, signedness), (COLUMN_CHARSET, charsets), (COLUMN_NAME, names), (SIMPLE_PRIMARY_KEY, keys)))
+        count = len(columns)
+        body = (struct.pack('<Q', table_id)[:6] + b'\x01\x00' + bytes([len(schema)]) + schema.encode() + b'\0' +
+                bytes([len(table)]) + table.encode() + b'\0' + lenenc(count) + types + lenenc(len(meta)) + meta +
+                b'\xff' * ((count + 7) // 8) + optional)
+        self.event(TABLE_MAP_EVENT, body, timestamp)
+
+    @staticmethod
+    def row_image(columns, values):
+        null_bitmap = bytearray((len(columns) + 7) // 8)
+        data = b''
+        for index, ((_, column_type, _), value) in enumerate(zip(columns, values)):
+            if value is None:
+                null_bitmap[index // 8] |= 1 << (index % 8)
+            elif column_type == FIELD_TYPE.LONG:
+                data += struct.pack('<i', value)
+            elif column_type == FIELD_TYPE.LONGLONG:
+                data += struct.pack('<q', value)
+            elif column_type == FIELD_TYPE.DATETIME2:
+                data += pack_datetime2(value)
+            elif column_type == FIELD_TYPE.VARCHAR:
+                value = value.encode()
+                data += struct.pack('<H', len(value)) + value
+            elif column_type == FIELD_TYPE.BLOB:
+                data += struct.pack('<H', len(value)) + value
+        return bytes(null_bitmap) + data
+
+    def rows(self, event_type, table_id, columns, rows, timestamp):
+        bitmap = b'\xff' * ((len(columns) + 7) // 8)
+        body = (struct.pack('<Q', table_id)[:6] + b'\x00\x00' + struct.pack('<H', 2) + lenenc(len(columns)) +
+                bitmap)
+        if event_type == UPDATE_ROWS_EVENT_V2:
+            body += bitmap
+            for before, after in rows:
+                body += self.row_image(columns, before) + self.row_image(columns, after)
+        else:
+            for row in rows:
+                body += self.row_image(columns, row)
+        self.event(event_type, body, timestamp)
+
+    def xid(self, xid, timestamp):
+        self.event(XID_EVENT, struct.pack('<Q', xid), timestamp)
+
+    def close(self):
+        self.file.close()
+
+
+# 基准测试用的两张表：窄表 orders（整数、字符串、时间、可为 NULL 的列），宽值表 attachments（BLOB）
+ORDERS = [("id", FIELD_TYPE.LONGLONG, None), ("customer", FIELD_TYPE.VARCHAR, CHARSET_UTF8MB4),
+          ("amount", FIELD_TYPE.LONG, None), ("status", FIELD_TYPE.VARCHAR, CHARSET_UTF8MB4),
+          ("note", FIELD_TYPE.VARCHAR, CHARSET_UTF8MB4), ("created_at", FIELD_TYPE.DATETIME2, None)]
+ATTACHMENTS = [("id", FIELD_TYPE.LONG, None), ("order_id", FIELD_TYPE.LONGLONG, None),
+               ("name", FIELD_TYPE.VARCHAR, CHARSET_UTF8MB4), ("content", FIELD_TYPE.BLOB, CHARSET_BINARY)]
+
+
+def write_fixture(path, first_id, transactions, seed):
+    # 每个事务：批量插入 orders，更新其中一部分，偶尔插入附件，再删除一部分，覆盖三种行事件和 NULL 值
+    rng = random.Random(seed)
+    writer = BinlogWriter(path)
+    next_id = first_id
+    for xid in range(transactions):
+        timestamp = FIXTURE_START_TIME + (first_id // 10) + xid
+        created_at = datetime.datetime(2024, 8, 26, 10, 0, 0) + datetime.timedelta(seconds=xid)
+        writer.query("shop", "BEGIN", timestamp)
+
+        orders = []
+        for _ in range(rng.randint(5, 20)):
+            note = None if rng.random() < 0.3 else "备注'" + "x" * rng.randint(0, 80)
+            orders.append([next_id, f"customer-{rng.randint(1, 5000)}", rng.randint(1, 100000), "new", note,
+                           created_at])
+            next_id += 1
+        writer.table_map(101, "shop", "orders", ORDERS, timestamp)
+        writer.rows(WRITE_ROWS_EVENT_V2, 101, ORDERS, orders, timestamp)
+
+        updates = [(row, row[:3] + ["paid"] + row[4:]) for row in orders if rng.random() < 0.5]
+        if updates:
+            writer.table_map(101, "shop", "orders", ORDERS, timestamp)
+            writer.rows(UPDATE_ROWS_EVENT_V2, 101, ORDERS, updates, timestamp)
+
+        if rng.random() < 0.2:
+            attachment = [next_id, orders[0][0], f"invoice-{next_id}.pdf", rng.randbytes(rng.randint(256, 1024))]
+            writer.table_map(102, "shop", "attachments", ATTACHMENTS, timestamp)
+            writer.rows(WRITE_ROWS_EVENT_V2, 102, ATTACHMENTS, [attachment], timestamp)
+
+        deletes = [row for row in orders if rng.random() < 0.2]
+        if deletes:
+            writer.table_map(101, "shop", "orders", ORDERS, timestamp)
+            writer.rows(DELETE_ROWS_EVENT_V2, 101, ORDERS, deletes, timestamp)
+        writer.xid(xid + 1, timestamp)
+    writer.close()
+
+
+def write_fixtures(directory=FIXTURES_DIR):
+    os.makedirs(directory, exist_ok=True)
+    write_fixture(os.path.join(directory, "mysql-bin.000001"), 1, 400, seed=1)
+    write_fixture(os.path.join(directory, "mysql-bin.000002"), 100001, 400, seed=2)
+
+
+if __name__ == "__main__":
+    write_fixtures(sys.argv[1] if len(sys.argv) > 1 else FIXTURES_DIR)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# comment: 合成行事件生成器，不连接 MySQL、不解析 binlog，直接构造已解码的 Write/Update/DeleteRowsEvent
+
+import datetime
+import random
+
+from pymysqlreplication.column import Column
+from pymysqlreplication.constants import FIELD_TYPE
+from pymysqlreplication.row_event import WriteRowsEvent, UpdateRowsEvent, DeleteRowsEvent
+
+# 基准测试的数据分布：列数、列类型轮换顺序、NULL 比例、字符串/二进制值的字节数、每个事件的行数、操作类型比例
+PROFILES = {
+    "narrow": {"columns": 6, "types": ["int", "varchar", "int", "varchar", "datetime", "varchar"],
+               "null_ratio": 0.1, "value_bytes": 16, "rows_per_event": 10,
+               "operations": {"insert": 0.4, "update": 0.4, "delete": 0.2}},
+    "wide": {"columns": 40, "types": ["int", "varchar", "json", "datetime", "bytes", "decimal", "varchar", "int"],
+             "null_ratio": 0.2, "value_bytes": 32, "rows_per_event": 10,
+             "operations": {"insert": 0.4, "update": 0.4, "delete": 0.2}},
+    "large-values": {"columns": 4, "types": ["int", "varchar", "bytes", "json"],
+                     "null_ratio": 0.0, "value_bytes": 4096, "rows_per_event": 4,
+                     "operations": {"insert": 0.4, "update": 0.4, "delete": 0.2}},
+    "update-heavy": {"columns": 12, "types": ["int", "varchar", "int", "datetime", "varchar", "json"],
+                     "null_ratio": 0.1, "value_bytes": 24, "rows_per_event": 20,
+                     "operations": {"update": 1.0}},
+}
+
+COLUMN_TYPES = {
+    "int": FIELD_TYPE.LONGLONG,
+    "varchar": FIELD_TYPE.VARCHAR,
+    "json": FIELD_TYPE.JSON,
+    "datetime": FIELD_TYPE.DATETIME2,
+    "bytes": FIELD_TYPE.BLOB,
+    "decimal": FIELD_TYPE.NEWDECIMAL,
+}
+
+EVENT_CLASSES = {"insert": WriteRowsEvent, "update": UpdateRowsEvent, "delete": DeleteRowsEvent}
+
+
+class SyntheticRowsEvent(object):
+    # 与解码后的行事件接口一致：schema、table、timestamp、columns、rows；
+    # 通过动态子类保留 isinstance(WriteRowsEvent) 等判断，而不执行 binlog 解码
+    rows = None
+
+    def __init__(self, schema, table, timestamp, columns, rows):
+        self.schema = schema
+        self.table = table
+        self.timestamp = timestamp
+        self.columns = columns
+        self.rows = rows
+
+
+SYNTHETIC_CLASSES = {operation: type(f"Synthetic{cls.__name__}", (SyntheticRowsEvent, cls), {})
+                     for operation, cls in EVENT_CLASSES.items()}
+
+
+def make_columns(profile):
+    types = profile["types"]
+    columns = [Column(name="id", type=FIELD_TYPE.LONGLONG, is_primary=True)]
+    for index in range(1, profile["columns"]):
+        type_name = types[index % len(types)]
+        columns.append(Column(name=f"c{index}_{type_name}", type=COLUMN_TYPES[type_name], is_primary=False))
+    return columns
+
+
+def make_value(rng, type_name, value_bytes):
+    if type_name == "int":
+        return rng.randint(-2 ** 40, 2 ** 40)
+    if type_name == "varchar":
+        # 含需要转义的引号、反斜杠和多字节字符
+        text = "".join(rng.choice("abcdefghij'\\中文") for _ in range(value_bytes))
+        return text
+    if type_name == "json":
+        return {"id": rng.randint(0, 1000), "tags": ["a", "b'c"], "payload": "x" * max(value_bytes - 32, 0),
+                "nested": {"ok": True, "value": None}}
+    if type_name == "datetime":
+        return datetime.datetime(2024, 8, 26, 10, 0, 0) + datetime.timedelta(seconds=rng.randint(0, 86400))
+    if type_name == "bytes":
+        return rng.randbytes(value_bytes)
+    if type_name == "decimal":
+        return rng.randint(0, 10 ** 8) / 100
+    raise ValueError(type_name)
+
+
+def make_row(rng, profile, row_id):
+    types = profile["types"]
+    values = {"id": row_id}
+    for index in range(1, profile["columns"]):
+        type_name = types[index % len(types)]
+        name = f"c{index}_{type_name}"
+        values[name] = None if rng.random() < profile["null_ratio"] else make_value(rng, type_name,
+                                                                                    profile["value_bytes"])
+    return values
+
+
+def generate_events(profile_name, events, seed=0, schema="bench", table=None, start_time=1724637600):
+    # 按固定的随机种子生成，相同参数每次得到完全一致的事件序列
+    profile = PROFILES[profile_name]
+    rng = random.Random(seed)
+    columns = make_columns(profile)
+    table = table or profile_name.replace("-", "_")
+    operations = list(profile["operations"])
+    weights = list(profile["operations"].values())
+    row_id = 0
+    for index in range(events):
+        operation = rng.choices(operations, weights)[0]
+        rows = []
+        for _ in range(profile["rows_per_event"]):
+            row_id += 1
+            if operation == "update":
+                before = make_row(rng, profile, row_id)
+                after = make_row(rng, profile, row_id)
+                rows.append({"before_values": before, "after_values": after})
+            else:
+                rows.append({"values": make_row(rng, profile, row_id)})
+        yield SYNTHETIC_CLASSES[operation](schema, table, start_time + index, columns, rows)
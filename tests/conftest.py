@@ -0,0 +1,34 @@
+# -*- coding:utf-8 -*-
+# comment: 测试公共设置：从仓库根目录导入 zrbin2sql，离线输入使用 benchmarks/fixtures 中的 binlog 样本文件
+
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+FIXTURES_DIR = os.path.join(ROOT_DIR, "benchmarks", "fixtures")
+FIXTURE_FILES = [os.path.join(FIXTURES_DIR, name) for name in ("mysql-bin.000001", "mysql-bin.000002")]
+# 样本中的事件时间在 2024-08-26 前后，这个窗口覆盖全部事件（与系统时区无关）
+ALL_TIME = ("2000-01-01 00:00:00", "2100-01-01 00:00:00")
+LOCAL_SETTINGS = {"charset": "utf8"}
+RENDER_OPTIONS = {"only_operation": None, "replace_output": False, "replace_without_null_output": False,
+                  "pk_where": False, "batch_rollback": False, "where": None}
+
+
+@pytest.fixture
+def fixture_files():
+    return list(FIXTURE_FILES)
+
+
+def read_output(directory):
+    # 输出目录中每个 SQL 文件的内容，文件名去掉运行时间戳（YYYY-MM-DD_HH:MM:SS）后作为键
+    contents = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".sql"):
+            prefix, _, rest = filename.partition("_recover_")
+            with open(os.path.join(directory, filename), encoding="utf-8") as file:
+                contents[prefix + rest[19:-len(".sql")]] = file.read()
+    return contents
@@ -0,0 +1,83 @@
+# -*- coding:utf-8 -*-
+# comment: 批量回滚：相邻的同表回滚语句合并为多行 INSERT / WHERE 键 IN (...) / WHERE (...) OR (...)
+
+from pymysqlreplication.constants import FIELD_TYPE
+
+import zrbin2sql
+
+COLUMNS = (("id", FIELD_TYPE.LONGLONG), ("name", FIELD_TYPE.VARCHAR))
+
+
+def rows(operation, images, table="orders", key_columns=("id",)):
+    return list(zrbin2sql.render_rows(operation, "shop", table, 1724637600, COLUMNS, images,
+                                      key_columns=key_columns, batch_rollback=True))
+
+
+def rollbacks(items, batch_size=1000, max_bytes=zrbin2sql.BATCH_MAX_BYTES):
+    return [item["rollback_sql"] for item in zrbin2sql.batch_rollback_statements(items, batch_size, max_bytes)]
+
+
+def test_delete_rollbacks_merge_into_multi_row_insert():
+    items = rows("delete", [(1, "a"), (2, None)])
+    assert rollbacks(items) == ["INSERT INTO `shop`.`orders`(`id`,`name`) VALUES (1,'a'),(2,NULL);"]
+
+
+def test_insert_rollbacks_merge_into_key_in():
+    assert rollbacks(rows("insert", [(1, "a"), (2, "b"), (3, "c")])) == \
+        ["DELETE FROM `shop`.`orders` WHERE `id` IN (1,2,3);"]
+    assert rollbacks(rows("insert", [(1, "a"), (2, "b")], key_columns=("id", "name"))) == \
+        ["DELETE FROM `shop`.`orders` WHERE (`id`,`name`) IN ((1,'a'),(2,'b'));"]
+
+
+def test_insert_rollbacks_without_key_merge_on_full_row():
+    assert rollbacks(rows("insert", [(1, "a"), (2, None)], key_columns=None)) == \
+        ["DELETE FROM `shop`.`orders` WHERE (`id`=1 AND `name`='a') OR (`id`=2 AND `name` IS NULL);"]
+    # 键列为 NULL 的行不能放进 IN (...)，按全部列单独合并
+    assert rollbacks(rows("insert", [(1, "a"), (None, "n"), (None, "m"), (3, "c")])) == [
+        "DELETE FROM `shop`.`orders` WHERE `id`=1;",
+        "DELETE FROM `shop`.`orders` WHERE (`id` IS NULL AND `name`='n') OR (`id` IS NULL AND `name`='m');",
+        "DELETE FROM `shop`.`orders` WHERE `id`=3;",
+    ]
+
+
+def test_single_statement_keeps_row_rollback():
+    items = rows("insert", [(1, "a")])
+    assert rollbacks(items) == [items[0]["rollback_sql"]]
+
+
+def test_other_statements_and_tables_break_batches():
+    items = (rows("insert", [(1, "a"), (2, "b")]) + rows("update", [((3, "c"), (3, "d"))])
+             + rows("insert", [(4, "e")]) + rows("insert", [(5, "f")], table="items"))
+    assert rollbacks(items) == [
+        "DELETE FROM `shop`.`orders` WHERE `id` IN (1,2);",
+        "UPDATE `shop`.`orders` SET `id`=3,`name`='c' WHERE `id`=3;",
+        "DELETE FROM `shop`.`orders` WHERE `id`=4;",
+        "DELETE FROM `shop`.`items` WHERE `id`=5;",
+    ]
+
+
+def test_batch_size_limit():
+    assert rollbacks(rows("insert", [(i, "x") for i in range(5)]), batch_size=2) == [
+        "DELETE FROM `shop`.`orders` WHERE `id` IN (0,1);",
+        "DELETE FROM `shop`.`orders` WHERE `id` IN (2,3);",
+        "DELETE FROM `shop`.`orders` WHERE `id`=4;",
+    ]
+
+
+def test_max_bytes_limit_is_exact():
+    for key_columns in (("id",), None):
+        items = rows("insert", [(1000000 + i, "x" * 10) for i in range(20)], key_columns=key_columns)
+        separator = items[0]["rollback_batch"][3]
+        part = items[0]["rollback_batch"][1]
+        statements = rollbacks(items, max_bytes=150)
+        assert len(statements) > 1
+        assert all(len(sql.encode("utf-8")) <= 150 for sql in statements)
+        # 每一批都尽量装满：再加一行就会超过上限
+        assert len(statements[0].encode("utf-8")) + len(separator) + len(part) > 150
+
+
+def test_merged_statement_keeps_original_sql():
+    items = rows("insert", [(1, "a"), (2, "b")])
+    merged = list(zrbin2sql.batch_rollback_statements(items))
+    assert merged[0]["sql"] == "\n \t-- ".join(item["sql"] for item in items)
+    assert merged[0]["event_time"] == items[0]["event_time"]
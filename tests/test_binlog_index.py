@@ -0,0 +1,72 @@
+# -*- coding:utf-8 -*-
+# comment: 时间戳索引：按起始时间定位到之前最近的事务边界，索引可以复用，文件被替换后重新建立
+
+import os
+import shutil
+import sys
+
+import zrbin2sql
+from conftest import LOCAL_SETTINGS, RENDER_OPTIONS
+
+
+def scan_from(paths, log_pos, start_time):
+    stream = zrbin2sql.open_binlog_stream(LOCAL_SETTINGS, None, log_pos, local_binlog=paths,
+                                          only_events=zrbin2sql.ROW_EVENTS + [zrbin2sql.QueryEvent])
+    try:
+        return [item for binlogevent in zrbin2sql.read_binlogevents(stream, start_time, sys.maxsize)
+                for item in zrbin2sql.process_binlogevent(binlogevent, start_time, sys.maxsize, **RENDER_OPTIONS)]
+    finally:
+        stream.close()
+
+
+def test_seek_before_first_event_starts_at_beginning(tmp_path, fixture_files):
+    index_path = str(tmp_path / "index.json")
+    binlog_file, log_pos, paths = zrbin2sql.seek_binlog_position(index_path, 0, LOCAL_SETTINGS,
+                                                                 local_binlog=fixture_files)
+    assert (binlog_file, log_pos, paths) == (None, 4, fixture_files)
+    assert os.path.exists(index_path)
+
+
+def test_seek_lands_on_boundary_before_start_time(tmp_path, fixture_files):
+    index_path = str(tmp_path / "index.json")
+    boundaries = zrbin2sql.find_transaction_boundaries(fixture_files[1])
+    start_time = boundaries[len(boundaries) // 2][0]
+    _, log_pos, paths = zrbin2sql.seek_binlog_position(index_path, start_time, LOCAL_SETTINGS,
+                                                       local_binlog=fixture_files)
+    assert paths == fixture_files[1:]
+    # 定位到最后一个早于起始时间的事务之后
+    assert (max(timestamp for timestamp, _ in boundaries if timestamp < start_time), log_pos) in boundaries
+    assert log_pos > 4
+    # 从定位的位置开始扫描与从头扫描的结果相同
+    assert scan_from(paths, log_pos, start_time) == scan_from(fixture_files, 4, start_time)
+
+
+def test_seek_reuses_index_and_keeps_binlog_pos(tmp_path, fixture_files):
+    index_path = str(tmp_path / "index.json")
+    zrbin2sql.seek_binlog_position(index_path, 0, LOCAL_SETTINGS, local_binlog=fixture_files)
+    index = zrbin2sql.load_binlog_index(index_path)
+    entry = index["local"][os.path.abspath(fixture_files[0])]
+    assert entry["checkpoints"] and entry["size"] == os.path.getsize(fixture_files[0])
+    # 起始时间之前没有检查点时使用 --binlog-pos
+    _, log_pos, _ = zrbin2sql.seek_binlog_position(index_path, 0, LOCAL_SETTINGS, binlog_pos=120,
+                                                   local_binlog=fixture_files)
+    assert log_pos == 120
+    assert zrbin2sql.load_binlog_index(index_path) == index
+
+
+def test_replaced_file_is_reindexed(tmp_path, fixture_files):
+    index_path = str(tmp_path / "index.json")
+    path = str(tmp_path / "mysql-bin.000001")
+    shutil.copyfile(fixture_files[1], path)
+    boundaries = zrbin2sql.find_transaction_boundaries(path)
+    zrbin2sql.seek_binlog_position(index_path, 0, LOCAL_SETTINGS, local_binlog=[path])
+    # 同名文件换成另一个 binlog：旧的检查点被丢弃，定位结果来自新文件
+    shutil.copyfile(fixture_files[0], path)
+    start_time = boundaries[-1][0] + 1
+    _, log_pos, _ = zrbin2sql.seek_binlog_position(index_path, start_time, LOCAL_SETTINGS, local_binlog=[path])
+    entry = zrbin2sql.load_binlog_index(index_path)["local"][os.path.abspath(path)]
+    expected = zrbin2sql.new_index_entry()
+    zrbin2sql.add_index_checkpoints(expected, zrbin2sql.find_transaction_boundaries(path))
+    assert entry["size"] == os.path.getsize(fixture_files[0])
+    assert entry["checkpoints"] == expected["checkpoints"]
+    assert log_pos == expected["checkpoints"][-1][1]
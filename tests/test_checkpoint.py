@@ -0,0 +1,101 @@
+# -*- coding:utf-8 -*-
+# comment: 检查点续传：输出文件截断到检查点记录的大小，只删除本次运行记录过的、检查点之后创建的文件
+
+import json
+import os
+
+import pytest
+
+import zrbin2sql
+
+FORMATTED_TIME = "2024-08-26_10:00:00"
+ENABLED = {"rollback_sql": True, "rollback_replace_sql": False, "rollback_replace_without_null_sql": False}
+
+
+def item(table, row_id):
+    return {"event_time": 1724637600, "schema": "shop", "table": table, "operation": "insert",
+            "sql": f"INSERT INTO `shop`.`{table}`(`id`) VALUES ({row_id});",
+            "rollback_sql": f"DELETE FROM `shop`.`{table}` WHERE `id`={row_id};"}
+
+
+def writers(directory, checkpoint_path, resume=None):
+    return zrbin2sql.ResultWriters(FORMATTED_TIME, ENABLED, checkpoint_path=checkpoint_path,
+                                   checkpoint_options={"st": "x"}, resume=resume, directory=str(directory))
+
+
+def interrupt(result_writers):
+    # 模拟中断：缓冲区已经写出，但没有更新检查点，也没有生成 manifest
+    for writer in result_writers.writers.values():
+        writer.close()
+
+
+def output_path(directory, table):
+    return os.path.join(str(directory), f"shop_{table}_recover_{FORMATTED_TIME}.sql")
+
+
+def test_restore_truncates_and_removes_only_recorded_files(tmp_path):
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    first = writers(tmp_path, checkpoint_path)
+    first.write(item("orders", 1))
+    first.checkpoint(zrbin2sql.BinlogCheckpoint("mysql-bin.000001", 1000))
+    size = os.path.getsize(output_path(tmp_path, "orders"))
+    first.write(item("orders", 2))
+    first.write(item("items", 3))
+    interrupt(first)
+    assert os.path.getsize(output_path(tmp_path, "orders")) > size
+    # 同一目录中其他运行或用户自己的文件，即使文件名匹配也不能删除
+    unrelated = output_path(tmp_path, "customers")
+    with open(unrelated, "w") as file:
+        file.write("keep")
+
+    checkpoint = zrbin2sql.load_checkpoint(checkpoint_path)
+    assert checkpoint["binlog_file"] == "mysql-bin.000001" and checkpoint["binlog_pos"] == 1000
+    assert checkpoint["planned"] == [output_path(tmp_path, "orders"), output_path(tmp_path, "items")]
+
+    resumed = writers(tmp_path, checkpoint_path, resume=checkpoint)
+    assert os.path.getsize(output_path(tmp_path, "orders")) == size
+    assert not os.path.exists(output_path(tmp_path, "items"))
+    assert os.path.exists(unrelated)
+
+    # 续传后重新写入检查点之后的内容，结果与没有中断时相同
+    resumed.write(item("orders", 2))
+    resumed.write(item("items", 3))
+    with resumed:
+        pass
+    with open(output_path(tmp_path, "orders"), encoding="utf-8") as file:
+        content = file.read()
+    assert content.count("DELETE FROM `shop`.`orders`") == 2
+    with open(resumed.manifest_name, encoding="utf-8") as file:
+        manifest = json.load(file)
+    assert {entry["table"]: entry["rows"] for entry in manifest["files"]} == {"orders": 2, "items": 1}
+    assert zrbin2sql.load_checkpoint(checkpoint_path)["completed"]
+
+
+def test_restore_before_first_checkpoint(tmp_path):
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    first = writers(tmp_path, checkpoint_path)
+    first.write(item("orders", 1))
+    interrupt(first)
+    checkpoint = zrbin2sql.load_checkpoint(checkpoint_path)
+    assert checkpoint["binlog_file"] is None and checkpoint["files"] == []
+    writers(tmp_path, checkpoint_path, resume=checkpoint)
+    assert not os.path.exists(output_path(tmp_path, "orders"))
+
+
+def test_restore_fails_when_recorded_file_is_missing(tmp_path):
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    first = writers(tmp_path, checkpoint_path)
+    first.write(item("orders", 1))
+    first.checkpoint(zrbin2sql.BinlogCheckpoint("mysql-bin.000001", 1000))
+    os.remove(output_path(tmp_path, "orders"))
+    with pytest.raises(SystemExit):
+        writers(tmp_path, checkpoint_path, resume=zrbin2sql.load_checkpoint(checkpoint_path))
+
+
+def test_without_checkpoint_path_nothing_is_recorded(tmp_path):
+    result_writers = writers(tmp_path, None)
+    result_writers.write(item("orders", 1))
+    with result_writers:
+        pass
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(output_path(tmp_path, "orders")),
+                                                   f"zrbin2sql_manifest_{FORMATTED_TIME}.json"])
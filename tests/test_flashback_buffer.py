@@ -0,0 +1,99 @@
+# -*- coding:utf-8 -*-
+# comment: 持续跟踪：检查点按事务数、时间和心跳成批插入，环形缓冲区按批提交索引，重启时截掉未提交的部分
+
+import sys
+
+from pymysqlreplication.event import HeartbeatLogEvent, XidEvent
+from pymysqlreplication.row_event import WriteRowsEvent
+
+import zrbin2sql
+
+
+def event(cls, **attributes):
+    binlogevent = cls.__new__(cls)
+    binlogevent.__dict__.update(attributes)
+    return binlogevent
+
+
+class Stream(object):
+    # 与读取器接口一致：迭代事件，log_pos 为当前事件之后的位置
+    log_file = "mysql-bin.000001"
+    log_pos = 4
+
+    def __init__(self, events):
+        self.events = events
+
+    def __iter__(self):
+        for index, binlogevent in enumerate(self.events):
+            self.log_pos = (index + 1) * 10
+            yield binlogevent
+
+
+def row():
+    return event(WriteRowsEvent, timestamp=1724637600)
+
+
+def xid():
+    return event(XidEvent, xid=1)
+
+
+def heartbeat():
+    return event(HeartbeatLogEvent)
+
+
+def checkpoints(events, **options):
+    return [binlogevent.log_pos
+            for binlogevent in zrbin2sql.read_binlogevents(Stream(events), 0, sys.maxsize, **options)
+            if isinstance(binlogevent, zrbin2sql.BinlogCheckpoint)]
+
+
+def test_checkpoints_batched_by_transaction_count():
+    events = [row(), xid()] * 7
+    assert checkpoints(events, checkpoint_interval=3600, checkpoint_transactions=3) == [60, 120]
+    assert checkpoints(events, checkpoint_interval=0) == [20, 40, 60, 80, 100, 120, 140]
+    assert checkpoints(events) == []
+
+
+def test_heartbeat_flushes_committed_transactions():
+    events = [row(), xid(), row(), xid(), heartbeat(), heartbeat(), row(), heartbeat(), xid()]
+    # 空闲时的心跳在最后一个提交处补一个检查点；没有新的事务或者处在事务中间时不插入
+    assert checkpoints(events, checkpoint_interval=3600, checkpoint_transactions=100) == [40]
+
+
+def item(index, table="orders"):
+    return {"event_time": 1724637600 + index, "schema": "shop", "table": table, "operation": "insert",
+            "sql": f"INSERT INTO `shop`.`{table}`(`id`) VALUES ({index});",
+            "rollback_sql": f"DELETE FROM `shop`.`{table}` WHERE `id`={index};"}
+
+
+def test_buffer_keeps_only_committed_records(tmp_path):
+    buffer = zrbin2sql.FlashbackBuffer(str(tmp_path))
+    buffer.open_for_append()
+    buffer.append(item(1))
+    buffer.append(item(2, "items"))
+    buffer.commit(zrbin2sql.BinlogCheckpoint("mysql-bin.000001", 500))
+    buffer.append(item(3))
+    buffer.close()
+
+    # 最后一批没有提交：重启后从提交的位置继续，分段中多出的内容被截掉
+    buffer = zrbin2sql.FlashbackBuffer(str(tmp_path))
+    assert buffer.position() == ("mysql-bin.000001", 500)
+    buffer.open_for_append()
+    assert [record["rollback_sql"] for record in buffer.query(0, sys.maxsize)] == [item(1)["rollback_sql"],
+                                                                                   item(2, "items")["rollback_sql"]]
+    buffer.append(item(3))
+    buffer.commit(zrbin2sql.BinlogCheckpoint("mysql-bin.000001", 600))
+    assert [record["event_time"] for record in buffer.query(0, sys.maxsize, only_tables=["orders"])] == \
+        [1724637601, 1724637603]
+    buffer.close()
+
+
+def test_buffer_evicts_oldest_segments(tmp_path):
+    buffer = zrbin2sql.FlashbackBuffer(str(tmp_path), retention_seconds=60, segment_seconds=10)
+    buffer.open_for_append()
+    for index in range(0, 200, 5):
+        buffer.append(item(index))
+        buffer.commit(zrbin2sql.BinlogCheckpoint("mysql-bin.000001", 100 + index))
+    times = [record["event_time"] - 1724637600 for record in buffer.query(0, sys.maxsize)]
+    assert times[-1] == 195 and times[0] >= 195 - 60 - 10
+    buffer.close()
@@ -0,0 +1,85 @@
+# -*- coding:utf-8 -*-
+# comment: 净变更合并：按主键合并窗口内的变更，内存中的键超过上限后溢出到 SQLite 再取回
+
+import os
+import sys
+
+from pymysqlreplication.constants import FIELD_TYPE
+
+import zrbin2sql
+from conftest import LOCAL_SETTINGS, RENDER_OPTIONS
+
+COLUMNS = (("id", FIELD_TYPE.LONGLONG), ("name", FIELD_TYPE.VARCHAR))
+KEY = ("id",)
+
+
+def apply(index, row_id, seq, before, after):
+    return index.apply(("shop", "orders", (row_id,)), seq, 1724637600 + seq, COLUMNS, KEY, before, after)
+
+
+def test_changes_merge_per_key():
+    index = zrbin2sql.NetChangeIndex()
+    try:
+        apply(index, 1, 1, None, {"id": 1, "name": "a"})
+        apply(index, 1, 2, {"id": 1, "name": "a"}, {"id": 1, "name": "b"})
+        apply(index, 2, 3, {"id": 2, "name": "x"}, {"id": 2, "name": "y"})
+        apply(index, 2, 4, {"id": 2, "name": "y"}, None)
+        changes = list(index)
+    finally:
+        index.close()
+    assert [(change.initial, change.final, change.seq) for change in changes] == [
+        (None, {"id": 1, "name": "b"}, 2),
+        ({"id": 2, "name": "x"}, None, 4),
+    ]
+    assert [item["rollback_sql"] for change in changes for item in zrbin2sql.render_net_change(change)] == [
+        "DELETE FROM `shop`.`orders` WHERE `id`=1;",
+        "INSERT INTO `shop`.`orders`(`id`,`name`) VALUES (2,'x');",
+    ]
+
+
+def test_spill_and_pop_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(zrbin2sql.tempfile, "tempdir", str(tmp_path))
+    index = zrbin2sql.NetChangeIndex(memory_rows=10)
+    for row_id in range(50):
+        apply(index, row_id, row_id + 1, None, {"id": row_id, "name": "a"})
+    assert index.spilled > 0 and len(index.changes) <= 10
+    # 已经溢出的键再次变更时从 SQLite 取回，合并结果不受溢出影响
+    apply(index, 0, 51, {"id": 0, "name": "a"}, {"id": 0, "name": "b"})
+    change = index.pop(("shop", "orders", (0,)))
+    assert (change.initial, change.final, change.seq) == (None, {"id": 0, "name": "b"}, 51)
+    assert index.pop(("shop", "orders", (0,))) is None
+    index.put(("shop", "orders", (0,)), change)
+    apply(index, 1, 52, {"id": 1, "name": "a"}, None)
+
+    changes = list(index)
+    assert [change.seq for change in changes] == list(range(3, 51)) + [51, 52]
+    assert changes[-1].initial is None and changes[-1].final is None
+    assert list(zrbin2sql.render_net_change(changes[-1])) == []
+    index.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_layout_change_finishes_previous_change():
+    index = zrbin2sql.NetChangeIndex()
+    apply(index, 1, 1, None, {"id": 1, "name": "a"})
+    finished = index.apply(("shop", "orders", (1,)), 2, 1724637602, COLUMNS[:1], KEY, {"id": 1}, {"id": 1})
+    assert finished is not None and finished.final == {"id": 1, "name": "a"}
+    assert [change.columns for change in index] == [COLUMNS[:1]]
+    index.close()
+
+
+def compact(paths, memory_rows):
+    stream = zrbin2sql.open_binlog_stream(LOCAL_SETTINGS, None, 4, local_binlog=paths,
+                                          only_events=zrbin2sql.ROW_EVENTS + [zrbin2sql.QueryEvent])
+    try:
+        binlogevents = zrbin2sql.read_binlogevents(stream, 0, sys.maxsize)
+        return [item["rollback_sql"] for item in zrbin2sql.compact_binlogevents(
+            binlogevents, 0, sys.maxsize, dict(RENDER_OPTIONS, pk_where=True), memory_rows=memory_rows)]
+    finally:
+        stream.close()
+
+
+def test_compaction_spilled_equals_in_memory(fixture_files):
+    in_memory = compact(fixture_files, zrbin2sql.COMPACT_MEMORY_ROWS)
+    assert in_memory
+    assert compact(fixture_files, 50) == in_memory
@@ -0,0 +1,70 @@
+# -*- coding:utf-8 -*-
+# comment: 逆序输出：结果超过内存上限时分段写入临时文件，再从后往前读回
+
+import os
+
+import zrbin2sql
+from conftest import ALL_TIME, read_output
+
+
+def items(count):
+    return [{"event_time": 1724637600 + index, "schema": "shop", "table": "orders", "operation": "insert",
+             "sql": f"INSERT INTO `shop`.`orders`(`id`) VALUES ({index});",
+             "rollback_sql": f"DELETE FROM `shop`.`orders` WHERE `id`={index};"} for index in range(count)]
+
+
+def test_reverse_in_memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(zrbin2sql.tempfile, "tempdir", str(tmp_path))
+    results = items(100)
+    assert list(zrbin2sql.reverse_results(iter(results))) == results[::-1]
+    assert os.listdir(tmp_path) == []
+
+
+def test_reverse_spills_to_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(zrbin2sql.tempfile, "tempdir", str(tmp_path))
+    results = items(1000)
+    memory_bytes = zrbin2sql.result_size(results[0]) * 30
+    reversed_results = zrbin2sql.reverse_results(iter(results), memory_bytes)
+    first = next(reversed_results)
+    # 读完输入后已经分段写入临时文件
+    directories = os.listdir(tmp_path)
+    assert len(directories) == 1 and directories[0].startswith("zrbin2sql_reverse_")
+    assert len(os.listdir(tmp_path / directories[0])) > 10
+    assert [first] + list(reversed_results) == results[::-1]
+    assert os.listdir(tmp_path) == []
+
+
+def test_reverse_drops_checkpoints():
+    results = items(3)
+    checkpoint = {"checkpoint": zrbin2sql.BinlogCheckpoint("mysql-bin.000001", 100)}
+    assert list(zrbin2sql.reverse_results(iter([results[0], checkpoint] + results[1:]))) == results[::-1]
+
+
+def test_reverse_cleans_up_when_closed_early(tmp_path, monkeypatch):
+    monkeypatch.setattr(zrbin2sql.tempfile, "tempdir", str(tmp_path))
+    reversed_results = zrbin2sql.reverse_results(iter(items(1000)), 2048)
+    next(reversed_results)
+    assert os.listdir(tmp_path)
+    reversed_results.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_result_size_counts_statement_lists():
+    group = {"rollback_sql": "x" * 10, "rollback_statements": ["y" * 5, "z" * 5], "tables": [("shop", "orders")]}
+    assert zrbin2sql.result_size(group) == zrbin2sql.REVERSE_ITEM_OVERHEAD + 20
+
+
+def test_main_reverse_output_with_spill(tmp_path, fixture_files):
+    outputs = {}
+    for reverse in (False, True):
+        directory = tmp_path / f"reverse_{reverse}"
+        directory.mkdir()
+        zrbin2sql.main(local_binlog=fixture_files, binlog_pos=4, st=ALL_TIME[0], et=ALL_TIME[1], max_workers=4,
+                       mysql_charset="utf8", reverse=reverse, reverse_memory_mb=1, output_dir=str(directory),
+                       quiet=True)
+        outputs[reverse] = read_output(directory)
+    separator = "-- ----------------------------------------------------------\n"
+    assert outputs[True].keys() == outputs[False].keys()
+    for name, content in outputs[False].items():
+        blocks = content.split(separator)[:-1]
+        assert outputs[True][name].split(separator)[:-1] == blocks[::-1]
@@ -0,0 +1,95 @@
+# -*- coding:utf-8 -*-
+# comment: 并行扫描：事务边界、按文件/位置切分分区，多进程扫描的输出与串行扫描一致
+
+import os
+import sys
+
+import zrbin2sql
+from conftest import ALL_TIME, LOCAL_SETTINGS, RENDER_OPTIONS, read_output
+
+
+def serial_items(paths, start_time=0, end_time=sys.maxsize):
+    stream = zrbin2sql.open_binlog_stream(LOCAL_SETTINGS, None, 4, local_binlog=paths,
+                                          only_events=zrbin2sql.ROW_EVENTS + [zrbin2sql.QueryEvent])
+    try:
+        return [item for binlogevent in zrbin2sql.read_binlogevents(stream, start_time, end_time)
+                for item in zrbin2sql.process_binlogevent(binlogevent, start_time, end_time, **RENDER_OPTIONS)]
+    finally:
+        stream.close()
+
+
+def test_transaction_boundaries_follow_xid_events(fixture_files):
+    path = fixture_files[0]
+    boundaries = zrbin2sql.find_transaction_boundaries(path)
+    assert boundaries
+    positions = [pos for _, pos in boundaries]
+    assert positions == sorted(set(positions))
+    assert positions[-1] <= os.path.getsize(path)
+    timestamps = [timestamp for timestamp, _ in boundaries]
+    assert timestamps == sorted(timestamps)
+    # 从中间的边界开始只返回之后的边界
+    middle = positions[len(positions) // 2]
+    assert zrbin2sql.find_transaction_boundaries(path, middle) == [b for b in boundaries if b[1] > middle]
+
+
+def test_transaction_boundaries_of_truncated_file(tmp_path, fixture_files):
+    # 文件末尾不完整的事件被忽略，不会越界读取
+    with open(fixture_files[0], 'rb') as file:
+        data = file.read()
+    boundaries = zrbin2sql.find_transaction_boundaries(fixture_files[0])
+    cut = boundaries[2][1] + 10
+    truncated = tmp_path / "mysql-bin.000001"
+    truncated.write_bytes(data[:cut])
+    assert zrbin2sql.find_transaction_boundaries(str(truncated)) == boundaries[:3]
+    empty = tmp_path / "mysql-bin.000002"
+    empty.write_bytes(b"")
+    assert zrbin2sql.find_transaction_boundaries(str(empty)) == []
+
+
+def test_local_partitions_cover_files_at_transaction_boundaries(fixture_files):
+    partitions = zrbin2sql.list_local_partitions(fixture_files, 4, partition_bytes=200 * 1024)
+    assert len(partitions) > len(fixture_files)
+    for path in fixture_files:
+        parts = [partition for partition in partitions if partition["log_file"] == path]
+        boundaries = {pos for _, pos in zrbin2sql.find_transaction_boundaries(path)}
+        assert parts[0]["log_pos"] == 4
+        assert parts[-1]["end_log_pos"] is None
+        for previous, current in zip(parts, parts[1:]):
+            assert previous["end_log_pos"] == current["log_pos"]
+            assert current["log_pos"] in boundaries
+
+
+def test_local_partitions_one_per_small_file(fixture_files):
+    partitions = zrbin2sql.list_local_partitions(list(reversed(fixture_files)), 4)
+    assert [(partition["log_file"], partition["log_pos"], partition["end_log_pos"]) for partition in partitions] == \
+        [(fixture_files[0], 4, None), (fixture_files[1], 4, None)]
+
+
+def test_scan_partitions_match_serial_scan(fixture_files):
+    partitions = zrbin2sql.list_local_partitions(fixture_files, 4, partition_bytes=200 * 1024)
+    parallel = list(zrbin2sql.scan_partitions(partitions, 3, LOCAL_SETTINGS, None, RENDER_OPTIONS, 0, sys.maxsize))
+    expected = serial_items(fixture_files)
+    assert len(expected) == 17290
+    assert parallel == expected
+
+
+def test_scan_partitions_checkpoints_between_partitions(fixture_files):
+    partitions = zrbin2sql.list_local_partitions(fixture_files, 4)
+    results = list(zrbin2sql.scan_partitions(partitions, 2, LOCAL_SETTINGS, None, RENDER_OPTIONS, 0, sys.maxsize,
+                                             checkpoints=True))
+    checkpoints = [(index, item["checkpoint"]) for index, item in enumerate(results) if "checkpoint" in item]
+    assert [(c.log_file, c.log_pos) for _, c in checkpoints] == [("mysql-bin.000002", 4)]
+    # 检查点之前正好是第一个文件的全部输出
+    assert results[:checkpoints[0][0]] == serial_items(fixture_files[:1])
+
+
+def test_main_scan_workers_output_equals_serial(tmp_path, fixture_files):
+    outputs = {}
+    for scan_workers in (1, 2):
+        directory = tmp_path / f"workers_{scan_workers}"
+        directory.mkdir()
+        zrbin2sql.main(local_binlog=fixture_files, binlog_pos=4, st=ALL_TIME[0], et=ALL_TIME[1], max_workers=4,
+                       mysql_charset="utf8", scan_workers=scan_workers, output_dir=str(directory), quiet=True)
+        outputs[scan_workers] = read_output(directory)
+    assert outputs[1]
+    assert outputs[2] == outputs[1]
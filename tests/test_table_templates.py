@@ -0,0 +1,127 @@
+# -*- coding:utf-8 -*-
+# comment: 预编译表模板：语句渲染、按键生成条件、部分列镜像，DDL 解析与模板缓存失效
+
+import datetime
+import decimal
+
+import pytest
+from pymysqlreplication.constants import FIELD_TYPE
+
+import zrbin2sql
+
+COLUMNS = (("id", FIELD_TYPE.LONGLONG), ("name", FIELD_TYPE.VARCHAR), ("at", FIELD_TYPE.DATETIME2),
+           ("amount", FIELD_TYPE.NEWDECIMAL))
+ROW = (1, "a'b\\", datetime.datetime(2024, 1, 2, 3, 4, 5), decimal.Decimal("1.50"))
+
+
+@pytest.fixture
+def template():
+    return zrbin2sql.TableTemplate("shop", "orders", COLUMNS, ("id",))
+
+
+def test_render_values_once_per_column(template):
+    assert template.render(ROW) == ["1", "'a\\'b\\\\'", "'2024-01-02 03:04:05'", "1.50"]
+    assert template.render((None, "x", None, None)) == ["NULL", "'x'", "NULL", "NULL"]
+
+
+def test_insert_and_delete(template):
+    rendered = template.render(ROW)
+    assert template.insert(rendered) == \
+        "INSERT INTO `shop`.`orders`(`id`,`name`,`at`,`amount`) VALUES (1,'a\\'b\\\\','2024-01-02 03:04:05',1.50);"
+    assert template.delete(rendered) == \
+        "DELETE FROM `shop`.`orders` WHERE `id`=1 AND `name`='a\\'b\\\\' AND `at`='2024-01-02 03:04:05' " \
+        "AND `amount`=1.50;"
+    assert template.delete(rendered, by_key=True) == "DELETE FROM `shop`.`orders` WHERE `id`=1;"
+
+
+def test_null_conditions_and_null_keys(template):
+    rendered = template.render((None, "x", None, None))
+    # 键列为 NULL 时回退到全部列作为条件，NULL 使用 IS NULL
+    assert template.delete(rendered, by_key=True) == \
+        "DELETE FROM `shop`.`orders` WHERE `id` IS NULL AND `name`='x' AND `at` IS NULL AND `amount` IS NULL;"
+    assert template.key_value(rendered) is None
+
+
+def test_update_by_key(template):
+    before = template.render(ROW)
+    after = template.render((1, "new", None, decimal.Decimal("2")))
+    assert template.update(before, after, by_key=True) == \
+        "UPDATE `shop`.`orders` SET `id`=1,`name`='a\\'b\\\\',`at`='2024-01-02 03:04:05',`amount`=1.50 WHERE `id`=1;"
+
+
+def test_composite_key_value():
+    template = zrbin2sql.TableTemplate("shop", "items", COLUMNS, ("id", "name"))
+    rendered = template.render(ROW)
+    assert template.key_value(rendered) == "(1,'a\\'b\\\\')"
+    assert template.key_in_prefix == "DELETE FROM `shop`.`items` WHERE (`id`,`name`) IN ("
+
+
+def test_missing_key_column_uses_all_columns():
+    template = zrbin2sql.TableTemplate("shop", "orders", COLUMNS, ("missing",))
+    assert template.key_indexes is None and template.key_in_prefix is None
+    rendered = template.render(ROW)
+    assert template.delete(rendered, by_key=True) == template.delete(rendered)
+
+
+def test_partial_row_image(template):
+    # binlog_row_image 不是 FULL 时，按镜像中实际的列生成临时模板
+    assert template.for_row(dict(zip(("id", "name", "at", "amount"), ROW))) is template
+    partial = template.for_row({"id": 1, "name": None})
+    assert partial is not template
+    assert partial.insert(partial.render({"id": 1, "name": None})) == \
+        "INSERT INTO `shop`.`orders`(`id`,`name`) VALUES (1,NULL);"
+    assert partial.key_indexes == [0]
+
+
+def test_replace_without_null(template):
+    assert template.replace_without_null(["1", "NULL", "NULL", "2"], ["1", "NULL", "'x'", "NULL"]) == \
+        "REPLACE INTO `shop`.`orders` (`id`,`at`,`amount`) VALUES (1,'x',2);"
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("ALTER TABLE `a`.`B` ADD c int", {("a", "b")}),
+    ("drop table if exists x, db.y", {("def", "x"), ("db", "y")}),
+    ("RENAME TABLE a TO b, c.d TO e.f", {("def", "a"), ("def", "b"), ("c", "d"), ("e", "f")}),
+    ("create index i on t (c)", {("def", "t")}),
+    ("DROP INDEX i ON db.t", {("db", "t")}),
+    ("DROP DATABASE shop", {("shop", None)}),
+    ("truncate `we``ird`", {("def", "we`ird")}),
+    ("alter table t rename to u", {("def", "t"), ("def", "u")}),
+    ("ALTER TABLE t RENAME COLUMN a TO b", {("def", "t")}),
+    ("/* comment */ CREATE TABLE IF NOT EXISTS n (id int)", {("def", "n")}),
+])
+def test_ddl_tables(query, expected):
+    assert zrbin2sql.ddl_tables(query, "Def") == expected
+
+
+def test_ddl_matches_exact_identifiers():
+    assert zrbin2sql.ddl_matches(("Shop", "Orders"), {("shop", "orders")})
+    # 表名只是前缀或后缀时不匹配
+    assert not zrbin2sql.ddl_matches(("shop", "orders_archive"), {("shop", "orders")})
+    assert not zrbin2sql.ddl_matches(("shop", "orders"), {("other", "orders")})
+    assert zrbin2sql.ddl_matches(("shop", "orders"), {("shop", None)})
+    assert zrbin2sql.ddl_matches(("shop", "orders"), {(None, "orders")})
+
+
+def test_template_cache_reuses_and_invalidates():
+    cache = zrbin2sql.TableTemplateCache(maxsize=2)
+    first = cache.get("shop", "orders", COLUMNS)
+    assert cache.get("shop", "orders", COLUMNS) is first
+    archive = cache.get("shop", "orders_archive", COLUMNS)
+    cache.invalidate(zrbin2sql.ddl_tables("ALTER TABLE shop.orders ADD x int"))
+    assert cache.get("shop", "orders", COLUMNS) is not first
+    assert cache.get("shop", "orders_archive", COLUMNS) is archive
+    # 同一张表出现新的列布局时旧模板被替换
+    changed = cache.get("shop", "orders", COLUMNS[:2])
+    assert changed.names == ["id", "name"]
+    assert len(cache.templates) == 2
+
+
+def test_template_cache_evicts_least_recently_used():
+    cache = zrbin2sql.TableTemplateCache(maxsize=2)
+    first = cache.get("shop", "a", COLUMNS)
+    cache.get("shop", "b", COLUMNS)
+    cache.get("shop", "a", COLUMNS)
+    cache.get("shop", "c", COLUMNS)
+    assert cache.get("shop", "a", COLUMNS) is first
+    assert ("shop", "b") not in cache.layouts
@@ -0,0 +1,111 @@
+# -*- coding:utf-8 -*-
+# comment: 按事务分组：GTID/XID 标记、涉及多张表的事务、--start-gtid 转换为已执行的 GTID 集合
+
+import re
+import sys
+
+import pytest
+
+import zrbin2sql
+from conftest import ALL_TIME, LOCAL_SETTINGS, read_output
+
+UUID = "3e11fa47-71ca-11e1-9e33-c80aa9429562"
+OTHER = "4a7b9c2d-0000-11e1-9e33-c80aa9429562"
+
+
+def item(table, row_id, schema="shop"):
+    return {"event_time": 1724637600 + row_id, "schema": schema, "table": table, "operation": "insert",
+            "sql": f"INSERT INTO `{schema}`.`{table}`(`id`) VALUES ({row_id});",
+            "rollback_sql": f"DELETE FROM `{schema}`.`{table}` WHERE `id`={row_id};"}
+
+
+def commit(gtid=None):
+    return {"transaction": zrbin2sql.BinlogTransaction(gtid, 1, "mysql-bin.000001", 100)}
+
+
+def test_single_table_transaction():
+    groups = list(zrbin2sql.group_transactions([item("orders", 1), item("orders", 2), commit(f"{UUID}:5")]))
+    assert len(groups) == 1
+    group = groups[0]
+    assert (group["schema"], group["table"], group["tables"]) == ("shop", "orders", [("shop", "orders")])
+    assert group["event_time"] == 1724637601
+    # 回滚语句按逆序执行
+    assert group["rollback_sql"] == (f"-- GTID: {UUID}:5\n \tBEGIN;\n \t"
+                                     "DELETE FROM `shop`.`orders` WHERE `id`=2;\n \t"
+                                     "DELETE FROM `shop`.`orders` WHERE `id`=1;\n \tCOMMIT;")
+    assert group["rollback_statements"] == ["DELETE FROM `shop`.`orders` WHERE `id`=2;",
+                                            "DELETE FROM `shop`.`orders` WHERE `id`=1;"]
+
+
+def test_multi_table_transaction_uses_marker():
+    groups = list(zrbin2sql.group_transactions([item("orders", 1), item("items", 2), commit()]))
+    assert groups[0]["table"] == zrbin2sql.MULTI_TABLE
+    assert groups[0]["tables"] == [("shop", "orders"), ("shop", "items")]
+    assert groups[0]["rollback_sql"].startswith("BEGIN;")
+
+
+def test_checkpoints_empty_and_trailing_transactions():
+    checkpoint = {"checkpoint": zrbin2sql.BinlogCheckpoint("mysql-bin.000001", 100)}
+    groups = list(zrbin2sql.group_transactions([commit(), item("orders", 1), commit(), checkpoint,
+                                                item("orders", 2)]))
+    # 没有语句的事务不输出，检查点原样传递，扫描结束时不完整的事务同样输出
+    assert [group.get("rollback_statements") for group in groups] == [
+        ["DELETE FROM `shop`.`orders` WHERE `id`=1;"], None, ["DELETE FROM `shop`.`orders` WHERE `id`=2;"]]
+    assert groups[1] is checkpoint
+    assert groups[2]["gtid"] is None
+
+
+def test_replace_variants_fall_back_to_rollback():
+    update = dict(item("orders", 2), operation="update",
+                  rollback_replace_sql="REPLACE INTO `shop`.`orders` VALUES (2);")
+    group = next(zrbin2sql.group_transactions([item("orders", 1), update, commit()]))
+    assert group["rollback_replace_sql"] == ("BEGIN;\n \tREPLACE INTO `shop`.`orders` VALUES (2);\n \t"
+                                             "DELETE FROM `shop`.`orders` WHERE `id`=1;\n \tCOMMIT;")
+    assert "rollback_replace_without_null_sql" not in group
+
+
+@pytest.mark.parametrize("gtid_executed, expected", [
+    (f"{UUID}:1-100", f"{UUID}:1-9"),
+    (f"{OTHER}:1-20,\n{UUID}:1-50:60-100", f"{OTHER}:1-20,{UUID}:1-9"),
+    (f"{UUID.upper()}:1-10", f"{UUID}:1-9"),
+])
+def test_start_gtid_set(gtid_executed, expected):
+    assert zrbin2sql.start_gtid_set(UUID, 10, gtid_executed) == expected
+
+
+def test_start_gtid_set_errors():
+    with pytest.raises(ValueError):
+        zrbin2sql.start_gtid_set(UUID, 10, f"{OTHER}:1-100")
+    with pytest.raises(ValueError):
+        zrbin2sql.start_gtid_set(UUID, 200, f"{UUID}:1-100")
+
+
+def test_parse_start_gtid():
+    assert zrbin2sql.parse_start_gtid(f" {UUID}:10 ") == (UUID, 10)
+    for value in (f"{UUID}:1", f"{UUID}", "not-a-gtid:5"):
+        with pytest.raises(ValueError):
+            zrbin2sql.parse_start_gtid(value)
+
+
+def test_transaction_markers_match_xid_events(fixture_files):
+    stream = zrbin2sql.open_binlog_stream(LOCAL_SETTINGS, None, 4, local_binlog=fixture_files,
+                                          only_events=zrbin2sql.ROW_EVENTS + [zrbin2sql.QueryEvent,
+                                                                               zrbin2sql.XidEvent])
+    try:
+        markers = [event for event in zrbin2sql.read_binlogevents(stream, 0, sys.maxsize, transactions=True)
+                   if isinstance(event, zrbin2sql.BinlogTransaction)]
+    finally:
+        stream.close()
+    boundaries = [pos for path in fixture_files for _, pos in zrbin2sql.find_transaction_boundaries(path)]
+    assert [marker.log_pos for marker in markers] == boundaries
+    assert all(marker.xid is not None for marker in markers)
+
+
+def test_main_transactions_keep_every_statement(tmp_path, fixture_files):
+    zrbin2sql.main(local_binlog=fixture_files, binlog_pos=4, st=ALL_TIME[0], et=ALL_TIME[1], max_workers=4,
+                   mysql_charset="utf8", transactions=True, output_dir=str(tmp_path), quiet=True)
+    output = read_output(tmp_path)
+    statements = sum(len(re.findall(r"^\s*(?:DELETE|INSERT|UPDATE) ", content, re.MULTILINE))
+                     for content in output.values())
+    assert statements == 17290
+    assert all(content.count("BEGIN;") == content.count("COMMIT;") for content in output.values())
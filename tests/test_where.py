@@ -0,0 +1,133 @@
+# -*- coding:utf-8 -*-
+# comment: --where 条件：解析、三值逻辑、常量与行镜像值的类型转换、LIKE 转义、引用不存在的列
+
+import datetime
+import decimal
+
+import pytest
+
+import zrbin2sql
+
+ROW = {"id": 7, "name": "alice_smith", "amount": decimal.Decimal("10.10"), "ratio": 0.1, "flag": 1,
+       "note": None, "data": b"abc", "created_at": datetime.datetime(2024, 8, 26, 10, 0, 0),
+       "day": datetime.date(2024, 8, 26), "code": "42"}
+
+
+def matches(text, row=ROW):
+    predicate, _ = zrbin2sql.compile_where(text)
+    return predicate(row)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("id = 7", True),
+    ("id <> 7", False),
+    ("id >= 7 AND id < 8", True),
+    ("id = 1 OR name = 'alice_smith'", True),
+    ("NOT (id = 1)", True),
+    ("id BETWEEN 5 AND 10", True),
+    ("id NOT BETWEEN 5 AND 10", False),
+    ("id IN (1, 7, 9)", True),
+    ("id NOT IN (1, 9)", True),
+    ("note IS NULL", True),
+    ("note IS NOT NULL", False),
+    ("`name` LIKE 'ALICE%'", True),
+    ("name NOT LIKE '%bob%'", True),
+    ("name LIKE 'alice\\_smith'", True),
+    ("name LIKE 'alice\\%smith'", False),
+    ("name LIKE 'alice|_smith' ESCAPE '|'", True),
+    ("name LIKE 'alice|%' ESCAPE '|'", False),
+    ("amount = 10.1", True),
+    ("ratio = 0.1", True),
+    ("flag = TRUE", True),
+    ("flag = FALSE", False),
+    ("code = 42", True),
+    ("data = 'abc'", True),
+    ("created_at >= '2024-08-26 09:00:00'", True),
+    ("day = '2024-08-26'", True),
+    ("id = 'x'", False),
+])
+def test_compiled_predicates(text, expected):
+    assert matches(text) is expected
+
+
+def test_null_uses_three_valued_logic():
+    # NULL 参与的比较结果为 NULL，NOT NULL 仍为 NULL，只有结果为 True 的行保留
+    assert matches("note = 'x'") is False
+    assert matches("NOT note = 'x'") is False
+    assert matches("note = 'x' OR id = 7") is True
+    assert matches("note IN ('x', 'y')") is False
+    assert matches("id IN (1, NULL)") is False
+    assert matches("id IN (7, NULL)") is True
+
+
+def test_where_columns_are_collected():
+    _, columns = zrbin2sql.compile_where("id = 1 AND (`name` LIKE 'a%' OR note IS NULL)")
+    assert columns == frozenset({"id", "name", "note"})
+
+
+@pytest.mark.parametrize("text", [
+    "id =", "id = 1 AND", "(id = 1", "id NOT = 1", "id LIKE 'a' ESCAPE 'ab'", "id = 1 id", "id ~ 1",
+    "id = \"1\"",
+])
+def test_syntax_errors(text):
+    with pytest.raises(ValueError):
+        zrbin2sql.WhereParser(text).parse()
+
+
+@pytest.mark.parametrize("value, literal, expected", [
+    (1, 1, (1, 1)),
+    (True, 1, (1, 1)),
+    (1, True, (1, 1)),
+    (0.1, "0.1", (decimal.Decimal("0.1"), decimal.Decimal("0.1"))),
+    (decimal.Decimal("1.5"), 1.5, (decimal.Decimal("1.5"), decimal.Decimal("1.5"))),
+    ("0.1", 0.1, (decimal.Decimal("0.1"), decimal.Decimal("0.1"))),
+    (b"12", 12, (decimal.Decimal("12"), decimal.Decimal("12"))),
+    (b"abc", "abc", (b"abc", b"abc")),
+    ("abc", "abc", ("abc", "abc")),
+    (datetime.date(2024, 8, 26), "2024-08-26 10:00:00", (datetime.date(2024, 8, 26), datetime.date(2024, 8, 26))),
+    (5, "x", None),
+    ("abc", 1, None),
+    (datetime.datetime(2024, 8, 26), "tomorrow", None),
+    ({"a": 1}, "x", None),
+])
+def test_coerce_operand(value, literal, expected):
+    assert zrbin2sql.coerce_operand(value, literal) == expected
+
+
+def test_like_pattern_escapes():
+    assert zrbin2sql.like_pattern("a%b_").fullmatch("AxxbY")
+    assert zrbin2sql.like_pattern("100\\%").fullmatch("100%")
+    assert not zrbin2sql.like_pattern("100\\%").fullmatch("1000")
+    # 模式末尾的转义字符按字面匹配
+    assert zrbin2sql.like_pattern("a\\").fullmatch("a\\")
+    assert zrbin2sql.like_pattern("a.b").fullmatch("a.b")
+    assert not zrbin2sql.like_pattern("a.b").fullmatch("axb")
+
+
+class Column(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class RowsEvent(object):
+    def __init__(self, names, rows):
+        self.schema = "shop"
+        self.table = "orders"
+        self.columns = [Column(name) for name in names]
+        self.rows = rows
+
+
+def test_filter_images_and_unknown_column_warning(capsys):
+    zrbin2sql.where_checked_tables.clear()
+    event = RowsEvent(["id", "name"], [])
+    images = [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+    assert zrbin2sql.filter_images(event, "insert", images, "id = 2") == images[1:]
+    assert zrbin2sql.filter_images(event, "update", [(images[0], images[1])], "id = 2") == [(images[0], images[1])]
+    assert zrbin2sql.filter_images(event, "delete", images, None) is images
+    assert capsys.readouterr().err == ""
+
+    # 引用了不存在的列（列名区分大小写）：每个表只警告一次，该列按 NULL 处理
+    assert zrbin2sql.filter_images(event, "insert", images, "ID = 2") == []
+    assert zrbin2sql.filter_images(event, "insert", images, "ID = 2") == []
+    err = capsys.readouterr().err
+    assert err.count("警告") == 1 and "ID" in err and "shop.orders" in err